@@ -56,6 +56,9 @@ export function useVoiceConnection(wsUrl?: string) {
   const scriptProcessorRef = useRef<ScriptProcessorNode | null>(null);
   const sourceRef = useRef<MediaStreamAudioSourceNode | null>(null);
   const pingIntervalRef = useRef<ReturnType<typeof setInterval> | null>(null);
+  const playbackCtxRef = useRef<AudioContext | null>(null);
+  const playbackSourcesRef = useRef<Set<AudioBufferSourceNode>>(new Set());
+  const nextPlayTimeRef = useRef(0);
 
   const addMessage = useCallback((text: string, speaker: 'user' | 'assistant') => {
     if (!text.trim()) return;
@@ -68,34 +71,61 @@ export function useVoiceConnection(wsUrl?: string) {
     setState(prev => ({ ...prev, messages: [...prev.messages, msg] }));
   }, []);
 
-  const playAudio = useCallback((base64Data: string, sampleRate: number) => {
+  const playAudio = useCallback((frame: ArrayBuffer) => {
     try {
-      const binaryStr = atob(base64Data);
-      const bytes = new Uint8Array(binaryStr.length);
-      for (let i = 0; i < binaryStr.length; i++) {
-        bytes[i] = binaryStr.charCodeAt(i);
-      }
-
-      const int16 = new Int16Array(bytes.buffer);
+      // Binary frame: little-endian uint32 sample rate, then int16 PCM.
+      const sampleRate = new DataView(frame).getUint32(0, true);
+      const int16 = new Int16Array(frame, 4, (frame.byteLength - 4) >> 1);
       const float32 = new Float32Array(int16.length);
       for (let i = 0; i < int16.length; i++) {
         float32[i] = int16[i] / 32768.0;
       }
 
-      const playbackCtx = new AudioContext({ sampleRate });
+      // Audio arrives as a stream of small chunks; schedule each one to
+      // start where the previous one ends on a shared context.
+      let playbackCtx = playbackCtxRef.current;
+      if (!playbackCtx || playbackCtx.sampleRate !== sampleRate) {
+        playbackCtx?.close();
+        playbackCtx = new AudioContext({ sampleRate });
+        playbackCtxRef.current = playbackCtx;
+        nextPlayTimeRef.current = 0;
+      }
       const buffer = playbackCtx.createBuffer(1, float32.length, sampleRate);
       buffer.getChannelData(0).set(float32);
 
       const source = playbackCtx.createBufferSource();
       source.buffer = buffer;
       source.connect(playbackCtx.destination);
-      source.start();
-      source.onended = () => playbackCtx.close();
+      const startAt = Math.max(playbackCtx.currentTime, nextPlayTimeRef.current);
+      source.start(startAt);
+      nextPlayTimeRef.current = startAt + buffer.duration;
+      playbackSourcesRef.current.add(source);
+      source.onended = () => playbackSourcesRef.current.delete(source);
     } catch (e) {
       console.error('Audio playback error:', e);
     }
   }, []);
 
+  const stopPlayback = useCallback(() => {
+    playbackSourcesRef.current.forEach(source => {
+      try {
+        source.stop();
+      } catch {
+        // already stopped
+      }
+    });
+    playbackSourcesRef.current.clear();
+    nextPlayTimeRef.current = 0;
+  }, []);
+
+  const closePlayback = useCallback(() => {
+    stopPlayback();
+    if (playbackCtxRef.current) {
+      playbackCtxRef.current.close();
+      playbackCtxRef.current = null;
+    }
+  }, [stopPlayback]);
+
   const startMicrophone = useCallback(async () => {
     try {
       const stream = await navigator.mediaDevices.getUserMedia({
@@ -162,6 +192,7 @@ export function useVoiceConnection(wsUrl?: string) {
 
       const token = await fetchWsToken(httpBase);
       const ws = new WebSocket(`${wsBase}/ws/voice?token=${encodeURIComponent(token)}`);
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
 
       ws.onopen = async () => {
@@ -181,6 +212,10 @@ export function useVoiceConnection(wsUrl?: string) {
       };
 
       ws.onmessage = (event) => {
+        if (event.data instanceof ArrayBuffer) {
+          playAudio(event.data);
+          return;
+        }
         try {
           const data = JSON.parse(event.data);
 
@@ -188,8 +223,8 @@ export function useVoiceConnection(wsUrl?: string) {
             case 'transcript':
               addMessage(data.text, data.speaker);
               break;
-            case 'audio':
-              playAudio(data.data, data.sampleRate || 16000);
+            case 'clear':
+              stopPlayback();
               break;
             case 'status':
               setState(prev => ({ ...prev, status: data.message || data.status }));
@@ -216,6 +251,7 @@ export function useVoiceConnection(wsUrl?: string) {
           status: 'Disconnected',
         }));
         stopMicrophone();
+        closePlayback();
         if (pingIntervalRef.current) {
           clearInterval(pingIntervalRef.current);
           pingIntervalRef.current = null;
@@ -233,7 +269,7 @@ export function useVoiceConnection(wsUrl?: string) {
         status: 'Error',
       }));
     }
-  }, [wsBase, httpBase, addMessage, playAudio, startMicrophone, stopMicrophone]);
+  }, [wsBase, httpBase, addMessage, playAudio, stopPlayback, closePlayback, startMicrophone, stopMicrophone]);
 
   const disconnect = useCallback(() => {
     if (wsRef.current) {
@@ -241,6 +277,7 @@ export function useVoiceConnection(wsUrl?: string) {
       wsRef.current = null;
     }
     stopMicrophone();
+    closePlayback();
     if (pingIntervalRef.current) {
       clearInterval(pingIntervalRef.current);
       pingIntervalRef.current = null;
@@ -252,7 +289,7 @@ export function useVoiceConnection(wsUrl?: string) {
       isMuted: false,
       status: 'Disconnected',
     }));
-  }, [stopMicrophone]);
+  }, [stopMicrophone, closePlayback]);
 
   const toggleMute = useCallback(() => {
     if (streamRef.current) {
@@ -282,11 +319,12 @@ export function useVoiceConnection(wsUrl?: string) {
         wsRef.current.close();
       }
       stopMicrophone();
+      closePlayback();
       if (pingIntervalRef.current) {
         clearInterval(pingIntervalRef.current);
       }
     };
-  }, [stopMicrophone]);
+  }, [stopMicrophone, closePlayback]);
 
   return {
     ...state,
@@ -1,5 +1,7 @@
 """LLM configuration, system prompt, and tool definitions."""
 
+from typing import Final
+
 LLM_CONFIG = {
     "model": "gpt-4o-mini",
     "temperature": 0.1,  # Slightly more natural while still fast
@@ -43,7 +45,8 @@ RESPONSE EXAMPLES:
 
 NEVER volunteer medication details, timing, or refill info unless specifically asked."""
 
-TOOLS = [
+# Built once at import and shared by every session and LLM request.
+TOOLS: Final[list[dict]] = [
     {
         "type": "function",
         "function": {
@@ -12,7 +12,8 @@ Supports two STT paths:
                          via ``DeepgramSageMakerSTTService``
 
 The browser client (React / ``useVoiceConnection.ts``) speaks a custom
-WebSocket protocol (binary PCM in, JSON text out).  A custom
+WebSocket protocol: binary PCM in; binary TTS audio (a little-endian uint32
+sample rate, then PCM) and JSON text metadata out.  A custom
 ``RxConnectFrameSerializer`` translates between that wire format and
 Pipecat frames so ``FastAPIWebsocketTransport`` can drive the pipeline.
 
@@ -65,19 +66,9 @@ from pipecat.transports.websocket.fastapi import (
 from services.serializer import RxConnectFrameSerializer
 from services.processors import (
     AssistantTranscriptAccumulator,
-    AudioAccumulator,
     UserTranscriptForwarder,
 )
-from services.pharmacy import (
-    load_pharmacy_data,
-    verify_member_id,
-    list_member_orders,
-    get_order_details,
-    get_order_timing,
-    get_order_refills,
-    lookup_order_status,
-    end_session,
-)
+from services.pharmacy import call_tool, load_pharmacy_data
 from pipecat.services.llm_service import FunctionCallParams
 
 # ---------------------------------------------------------------------------
@@ -99,9 +90,18 @@ from config import (
 # ---------------------------------------------------------------------------
 app = FastAPI(title="RxConnect Voice Agent API – Pipecat")
 
-ALLOWED_ORIGINS = os.getenv(
-    "ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173"
-).split(",")
+# Exact origins only; a "*" entry is honoured only when DEV_MODE=true.
+DEV_MODE = os.getenv("DEV_MODE", "false").lower() == "true"
+ALLOWED_ORIGINS = [
+    origin
+    for origin in (
+        o.strip()
+        for o in os.getenv(
+            "ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173"
+        ).split(",")
+    )
+    if origin and (origin != "*" or DEV_MODE)
+]
 
 app.add_middleware(
     CORSMiddleware,
@@ -239,7 +239,7 @@ async def _create_pipeline(
     # ── Register pharmacy tool handlers ────────────────────────────────
 
     async def _on_verify_member_id(params: FunctionCallParams):
-        result = verify_member_id(**params.arguments)
+        result = await call_tool("verify_member_id", params.arguments)
         if result.get("found"):
             if session_state["member_id"] and session_state["member_id"] != result["member_id"]:
                 session_state["order_id"] = None
@@ -251,7 +251,7 @@ async def _create_pipeline(
         await params.result_callback(result)
 
     async def _on_list_member_orders(params: FunctionCallParams):
-        result = list_member_orders(**params.arguments)
+        result = await call_tool("list_member_orders", params.arguments)
         if result.get("found"):
             orders = result.get("orders", [])
             if len(orders) == 1:
@@ -262,33 +262,33 @@ async def _create_pipeline(
     async def _on_get_order_details(params: FunctionCallParams):
         if "order_id" in params.arguments:
             session_state["order_id"] = params.arguments["order_id"]
-        result = get_order_details(**params.arguments)
+        result = await call_tool("get_order_details", params.arguments)
         logger.info(f"[{session_id}] get_order_details → {result}")
         await params.result_callback(result)
 
     async def _on_get_order_timing(params: FunctionCallParams):
         if "order_id" in params.arguments:
             session_state["order_id"] = params.arguments["order_id"]
-        result = get_order_timing(**params.arguments)
+        result = await call_tool("get_order_timing", params.arguments)
         logger.info(f"[{session_id}] get_order_timing → {result}")
         await params.result_callback(result)
 
     async def _on_get_order_refills(params: FunctionCallParams):
         if "order_id" in params.arguments:
             session_state["order_id"] = params.arguments["order_id"]
-        result = get_order_refills(**params.arguments)
+        result = await call_tool("get_order_refills", params.arguments)
         logger.info(f"[{session_id}] get_order_refills → {result}")
         await params.result_callback(result)
 
     async def _on_lookup_order_status(params: FunctionCallParams):
         if "order_id" in params.arguments:
             session_state["order_id"] = params.arguments["order_id"]
-        result = lookup_order_status(**params.arguments)
+        result = await call_tool("lookup_order_status", params.arguments)
         logger.info(f"[{session_id}] lookup_order_status → {result}")
         await params.result_callback(result)
 
     async def _on_end_session(params: FunctionCallParams):
-        result = end_session(**params.arguments)
+        result = await call_tool("end_session", params.arguments)
         logger.info(f"[{session_id}] end_session → {result}")
         await params.result_callback(result)
 
@@ -322,7 +322,6 @@ async def _create_pipeline(
     # ── Custom processors ──────────────────────────────────────────────
     user_transcript_fwd = UserTranscriptForwarder()
     assistant_transcript_acc = AssistantTranscriptAccumulator()
-    audio_acc = AudioAccumulator()
 
     # ── Pipeline ───────────────────────────────────────────────────────
     #
@@ -338,9 +337,7 @@ async def _create_pipeline(
     #             │
     #   AssistantTranscriptAccumulator ──(sends {"type":"transcript","speaker":"assistant"})
     #             │
-    #           TTS
-    #             │
-    #   AudioAccumulator ──(buffers chunks into one blob)
+    #           TTS ──(audio chunks stream out as they are synthesized)
     #             │
     #   Audio Out ┘
     #             │
@@ -355,7 +352,6 @@ async def _create_pipeline(
             llm,
             assistant_transcript_acc,
             tts,
-            audio_acc,
             transport.output(),
             context_aggregator.assistant(),
         ]
@@ -411,7 +407,7 @@ async def root():
 
 @app.get("/api/pharmacy-data")
 async def pharmacy_data():
-    return load_pharmacy_data()
+    return await load_pharmacy_data()
 
 
 @app.get("/health")
@@ -472,4 +468,12 @@ async def voice_websocket(websocket: WebSocket, token: str = Query("")):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    # Workers > 1 need a shared WS_TOKEN_SECRET.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        "main:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+    )
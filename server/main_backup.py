@@ -6,25 +6,41 @@ Handles: STT (Deepgram / SageMaker) → LLM (OpenAI with Function Calling) → T
 import asyncio
 import hashlib
 import hmac
-import json
 import os
-import base64
 import random
 import secrets
+import struct
 import time
 import uuid
 import aiohttp
+import httpx
+import re
+import sys
 import websockets
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from types import SimpleNamespace
+from typing import AsyncIterator, Optional
 
 from fastapi import FastAPI, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+from loguru import logger
 from openai import AsyncOpenAI
 
+try:
+    import h2  # noqa: F401 – httpx needs it for HTTP/2
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
 load_dotenv(Path(__file__).parent / "config" / ".env", override=False)
 
+# enqueue=True hands records to loguru's writer thread, so logging on the
+# audio/LLM hot path never blocks the event loop on a stdout/stderr write.
+logger.remove()
+logger.add(sys.stderr, level=os.getenv("LOG_LEVEL", "INFO"), enqueue=True)
+
 from config import (
     STT_CONFIG,
     SAGEMAKER_CONFIG,
@@ -35,6 +51,8 @@ from config import (
     GREETING,
 )
 from config.stt import USE_FLUX_STT
+from services.json_utils import dumps as _json_dumps, loads as _json_loads
+from services.pharmacy import FUNCTION_MAP, call_tool, load_pharmacy_data
 
 # ---------------------------------------------------------------------------
 # Deepgram SDK + SageMaker transport
@@ -44,9 +62,18 @@ from deepgram.core.events import EventType
 
 app = FastAPI(title="RxConnect Voice Agent API")
 
-ALLOWED_ORIGINS = os.getenv(
-    "ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173"
-).split(",")
+# Exact origins only; a "*" entry is honoured only when DEV_MODE=true.
+DEV_MODE = os.getenv("DEV_MODE", "false").lower() == "true"
+ALLOWED_ORIGINS = [
+    origin
+    for origin in (
+        o.strip()
+        for o in os.getenv(
+            "ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173"
+        ).split(",")
+    )
+    if origin and (origin != "*" or DEV_MODE)
+]
 
 app.add_middleware(
     CORSMiddleware,
@@ -56,6 +83,27 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization"],
 )
 
+
+# ---------------------------------------------------------------------------
+# Client frames
+# ---------------------------------------------------------------------------
+async def _send_json(websocket, payload: dict):
+    """Send a JSON text frame (FastAPI's send_json uses stdlib json)."""
+    await websocket.send_text(_json_dumps(payload))
+
+
+# TTS audio goes to the client as binary frames: a little-endian uint32
+# sample rate followed by raw linear16 PCM, with no base64 or JSON wrapping.
+_AUDIO_PREFIX = struct.pack("<I", TTS_CONFIG["sample_rate"])
+
+# linear16 mono: two bytes per sample.
+_AUDIO_BYTES_PER_SECOND = TTS_CONFIG["sample_rate"] * 2
+
+
+def _audio_frame(chunk: bytes) -> bytes:
+    return _AUDIO_PREFIX + chunk
+
+
 # ---------------------------------------------------------------------------
 # WebSocket auth tokens
 # ---------------------------------------------------------------------------
@@ -90,45 +138,195 @@ def _verify_ws_token(token: str) -> bool:
 # ---------------------------------------------------------------------------
 # Clients
 # ---------------------------------------------------------------------------
-openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# One pooled client for every session's OpenAI calls. Connections stay warm
+# across turns, and with HTTP/2 concurrent sessions multiplex over them
+# instead of queueing for a free connection.
+_openai_http = httpx.AsyncClient(
+    http2=_HTTP2,
+    limits=httpx.Limits(
+        max_connections=64,
+        max_keepalive_connections=32,
+        keepalive_expiry=300,
+    ),
+    timeout=httpx.Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0),
+)
+openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=_openai_http)
+
+
+@app.on_event("shutdown")
+async def _close_openai_http():
+    await _openai_http.aclose()
+
+
+# Shared chat.completions.create arguments, built once at import.
+_LLM_KWARGS = {
+    "model": LLM_CONFIG["model"],
+    "tools": TOOLS,
+    "tool_choice": "auto",
+    "temperature": LLM_CONFIG["temperature"],
+    "max_tokens": LLM_CONFIG["max_tokens"],
+    "top_p": 0.8,  # Focus on high-probability tokens for speed
+}
+
+
+# Argument names each tool accepts, taken once from its TOOLS schema.
+_TOOL_ARG_NAMES: dict[str, frozenset[str]] = {
+    tool["function"]["name"]: frozenset(tool["function"]["parameters"]["properties"])
+    for tool in TOOLS
+}
+_TOOL_REQUIRED_ARGS: dict[str, frozenset[str]] = {
+    tool["function"]["name"]: frozenset(tool["function"]["parameters"].get("required", ()))
+    for tool in TOOLS
+}
+
+
+def _parse_tool_args(name: str, raw: str) -> dict:
+    """Decode a tool call's JSON arguments, keeping only keys its schema defines.
+
+    A stray key from the model would otherwise surface as a TypeError from
+    the tool function and fail the whole turn. Raises ``ValueError`` if a
+    required argument is missing.
+    """
+    args = _json_loads(raw) if raw else {}
+    missing = _TOOL_REQUIRED_ARGS.get(name, frozenset()) - args.keys()
+    if missing:
+        raise ValueError(f"Missing required arguments for {name}: {', '.join(sorted(missing))}")
+    allowed = _TOOL_ARG_NAMES.get(name)
+    if allowed is None or args.keys() <= allowed:
+        return args
+    return {k: v for k, v in args.items() if k in allowed}
+
+
+async def _tool_error(message: str) -> dict:
+    return {"error": message}
+
+
+def _serialize_assistant_with_tools(msg) -> dict:
+    """Build the history entry for an assistant message with tool calls."""
+    return {
+        "role": "assistant",
+        "content": msg.content,
+        "tool_calls": [
+            {
+                "id": tc.id,
+                "type": "function",
+                "function": {
+                    "name": tc.function.name,
+                    "arguments": tc.function.arguments,
+                },
+            }
+            for tc in msg.tool_calls
+        ],
+    }
+
+
+# Longest wait for the first or next streamed LLM chunk, so a stalled request
+# can't pin the turn. Time spent handing sentences to TTS doesn't count.
+LLM_TIMEOUT = 10.0
+
 
 deepgram_api_key = os.getenv("DEEPGRAM_API_KEY")
 if not deepgram_api_key:
-    print("WARNING: DEEPGRAM_API_KEY not set - STT/TTS will not work!")
+    logger.warning("DEEPGRAM_API_KEY not set - STT/TTS will not work!")
 else:
-    print(f"Deepgram API key loaded: {deepgram_api_key[:8]}...")
+    logger.info(f"Deepgram API key loaded: {deepgram_api_key[:8]}...")
 
 tts_client = AsyncDeepgramClient(api_key=deepgram_api_key)
 
-# Persistent TTS WebSocket connection for streaming TTS
-_tts_ws: Optional[websockets.WebSocketClientProtocol] = None
-_tts_ws_lock = asyncio.Lock()
 
-async def get_tts_ws() -> websockets.WebSocketClientProtocol:
-    """Get or create a persistent TTS WebSocket connection."""
-    global _tts_ws
-    async with _tts_ws_lock:
-        if _tts_ws is not None:
-            try:
-                # Check if still open
-                await _tts_ws.ping()
-                return _tts_ws
-            except Exception:
-                _tts_ws = None
-        
-        # Create new connection
-        model = TTS_CONFIG["model"]
-        encoding = TTS_CONFIG["encoding"]
-        sample_rate = TTS_CONFIG["sample_rate"]
-        uri = f"wss://api.deepgram.com/v1/speak?model={model}&encoding={encoding}&sample_rate={sample_rate}"
-        headers = {"Authorization": f"Token {deepgram_api_key}"}
-        _tts_ws = await websockets.connect(uri, additional_headers=headers)
-        return _tts_ws
+async def connect_tts_ws() -> websockets.WebSocketClientProtocol:
+    """Open a Deepgram streaming TTS WebSocket for the configured voice.
+
+    Each VoiceAgent holds its own connection for the life of the session, so
+    utterances skip the TLS handshake and sessions never interleave
+    Speak/Flush messages on a shared socket.
+    """
+    model = TTS_CONFIG["model"]
+    encoding = TTS_CONFIG["encoding"]
+    sample_rate = TTS_CONFIG["sample_rate"]
+    uri = f"wss://api.deepgram.com/v1/speak?model={model}&encoding={encoding}&sample_rate={sample_rate}"
+    headers = {"Authorization": f"Token {deepgram_api_key}"}
+    return await websockets.connect(uri, additional_headers=headers)
+
+
+async def _synthesize_tts(tts_ws, texts: list[str], timeout: float) -> AsyncIterator[bytes]:
+    """Speak ``texts`` with a single Flush and yield audio chunks until Flushed.
+
+    Chunks are re-cut on two-byte sample boundaries: each becomes its own
+    client frame, and Deepgram's messages needn't end on a whole sample.
+    """
+    for text in texts:
+        await tts_ws.send(_json_dumps({"type": "Speak", "text": text}))
+    await tts_ws.send(_json_dumps({"type": "Flush"}))
+    carry = b""
+    while True:
+        msg = await asyncio.wait_for(tts_ws.recv(), timeout=timeout)
+        if isinstance(msg, bytes):
+            if carry:
+                msg = carry + msg
+            cut = len(msg) & ~1
+            carry = msg[cut:]
+            if cut:
+                yield msg[:cut] if carry else msg
+        elif _json_loads(msg).get("type") == "Flushed":
+            return
+
+
+# Every session opens with the same greeting, already in its history and with
+# its audio frames built once at startup.
+_INITIAL_HISTORY = ({"role": "assistant", "content": GREETING},)
+_GREETING_FRAMES: list[bytes] = []
+
+# Synthesized audio for short, frequently repeated utterances (the greeting,
+# stock follow-ups), keyed by (text, model, sample_rate), least recently used
+# evicted first. Long responses are rarely repeated verbatim and not cached.
+_TTS_CACHE: OrderedDict[tuple[str, str, int], list[bytes]] = OrderedDict()
+_TTS_CACHE_MAX = 128
+_TTS_CACHE_MAX_CHARS = 200
+
+
+def _tts_cache_key(text: str) -> tuple[str, str, int]:
+    return (text, TTS_CONFIG["model"], TTS_CONFIG["sample_rate"])
+
+
+def _tts_cache_get(text: str) -> Optional[list[bytes]]:
+    key = _tts_cache_key(text)
+    chunks = _TTS_CACHE.get(key)
+    if chunks is not None:
+        _TTS_CACHE.move_to_end(key)
+    return chunks
+
+
+def _tts_cache_put(text: str, chunks: list[bytes]) -> None:
+    if not chunks or len(text) > _TTS_CACHE_MAX_CHARS:
+        return
+    _TTS_CACHE[_tts_cache_key(text)] = chunks
+    if len(_TTS_CACHE) > _TTS_CACHE_MAX:
+        _TTS_CACHE.popitem(last=False)
+
+
+@app.on_event("startup")
+async def _prewarm_tts_cache():
+    """Synthesize the fixed greeting once so connections skip its TTS call."""
+    if not deepgram_api_key:
+        return
+    try:
+        tts_ws = await connect_tts_ws()
+        try:
+            chunks = [c async for c in _synthesize_tts(tts_ws, [GREETING], timeout=10.0)]
+        finally:
+            await tts_ws.close()
+        _tts_cache_put(GREETING, chunks)
+        _GREETING_FRAMES[:] = [_audio_frame(c) for c in chunks]
+        logger.info(f"TTS cache warmed: greeting ({sum(map(len, chunks))} bytes)")
+    except Exception as e:
+        logger.warning(f"TTS cache warmup failed: {e}")
+
 
 USE_SAGEMAKER_STT = SAGEMAKER_CONFIG["enabled"]
 
 if USE_SAGEMAKER_STT:
-    print("Using SageMaker STT endpoint")
+    logger.info("Using SageMaker STT endpoint")
     from deepgram_sagemaker import SageMakerTransportFactory
     from deepgram.listen.v1.socket_client import AsyncV1SocketClient
 
@@ -137,7 +335,7 @@ if USE_SAGEMAKER_STT:
         region=SAGEMAKER_CONFIG["region"],
     )
 else:
-    print("Using Deepgram Cloud STT")
+    logger.info("Using Deepgram Cloud STT")
     stt_client = AsyncDeepgramClient(api_key=deepgram_api_key)
 
 # ---------------------------------------------------------------------------
@@ -146,294 +344,32 @@ else:
 active_sessions: dict[str, "VoiceAgent"] = {}
 MAX_CONCURRENT_SESSIONS = 10
 
-# ---------------------------------------------------------------------------
-# Pharmacy data
-# ---------------------------------------------------------------------------
-DATA_FILE = Path(__file__).parent.parent / "data" / "pharmacy-order-data.json"
-_pharmacy_data_cache: Optional[list] = None
-_pharmacy_data_cache_time: float = 0
-DEMO_WEEK_DATES = [
-    "2025-03-23",
-    "2025-03-24",
-    "2025-03-25",
-    "2025-03-26",
-    "2025-03-27",
-]
+# Conversation history grows append-only up to HISTORY_MAX_MESSAGES, then is
+# cut back to roughly the last HISTORY_KEEP_MESSAGES.
+HISTORY_MAX_MESSAGES = 20
+HISTORY_KEEP_MESSAGES = 10
+_SYSTEM_MSG = {"role": "system", "content": PHARMACY_SYSTEM_PROMPT}
 
+# End of a sentence in streamed LLM output: terminal punctuation already
+# followed by whitespace. Punctuation at the end of the text received so far
+# may still continue ("3." + "50"), so the tail waits for more text or the
+# end-of-stream flush.
+_SENTENCE_END_RE = re.compile(r"[.!?](?=\s)")
 
-def normalize_id(id_raw):
-    """Normalize IDs to handle transcription variations."""
-    number_words = {
-        "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4",
-        "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
-    }
-    normalized = id_raw.upper()
-    for word, digit in number_words.items():
-        normalized = normalized.replace(word.upper(), digit)
-    normalized = normalized.replace(" ", "").replace("-", "").replace("_", "")
-    return normalized
-
-
-def _levenshtein_distance(a: str, b: str) -> int:
-    """Compute edit distance between two short strings."""
-    if a == b:
-        return 0
-    if not a:
-        return len(b)
-    if not b:
-        return len(a)
-
-    prev = list(range(len(b) + 1))
-    for i, ca in enumerate(a, start=1):
-        curr = [i]
-        for j, cb in enumerate(b, start=1):
-            ins = curr[j - 1] + 1
-            delete = prev[j] + 1
-            sub = prev[j - 1] + (0 if ca == cb else 1)
-            curr.append(min(ins, delete, sub))
-        prev = curr
-    return prev[-1]
-
-
-def resolve_member_id(member_id_raw):
-    """
-    Resolve spoken/noisy member IDs to the closest known ID.
-    Helps with STT/LLM artifacts like M100006 instead of M1006.
-    """
-    candidate = normalize_id(member_id_raw)
-    orders = load_pharmacy_data()
-    known_ids = sorted({normalize_id(o["member_id"]) for o in orders})
-
-    if candidate in known_ids:
-        return candidate
-
-    # Common omission: user/model provides only digits.
-    if candidate.isdigit():
-        m_prefixed = f"M{candidate}"
-        if m_prefixed in known_ids:
-            return m_prefixed
-
-    # Fuzzy correction: accept a unique close match only.
-    best_id = None
-    best_dist = 999
-    tied = False
-    for known in known_ids:
-        dist = _levenshtein_distance(candidate, known)
-        if dist < best_dist:
-            best_dist = dist
-            best_id = known
-            tied = False
-        elif dist == best_dist:
-            tied = True
-
-    if best_id and best_dist <= 2 and not tied:
-        return best_id
-
-    return candidate
-
-
-def load_pharmacy_data():
-    """Load pharmacy order data with in-memory caching."""
-    global _pharmacy_data_cache, _pharmacy_data_cache_time
-    now = time.time()
-    if _pharmacy_data_cache is not None and (now - _pharmacy_data_cache_time) < 60:
-        return _pharmacy_data_cache
-    try:
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
-            _pharmacy_data_cache = _normalize_dates_to_demo_week(data)
-            _pharmacy_data_cache_time = now
-            return _pharmacy_data_cache
-    except Exception as e:
-        print(f"Error loading pharmacy data: {e}")
-        return []
-
-
-def _looks_like_iso_date(value: str) -> bool:
-    return (
-        isinstance(value, str)
-        and len(value) >= 10
-        and value[4] == "-"
-        and value[7] == "-"
-        and value[:4].isdigit()
-        and value[5:7].isdigit()
-        and value[8:10].isdigit()
-    )
-
-
-def _normalize_dates_to_demo_week(orders):
-    """
-    Remap all timing dates into the demo week (Mar 23-27) while preserving time.
-    This keeps the data deterministic for demos without changing business logic.
-    """
-    for idx, order in enumerate(orders):
-        timing = order.get("timing")
-        if not isinstance(timing, dict):
-            continue
-
-        for offset, key in enumerate(sorted(timing.keys())):
-            value = timing.get(key)
-            if not value or not _looks_like_iso_date(value):
-                continue
+# Tells the client to stop audio it has already scheduled (barge-in).
+_CLEAR_FRAME = _json_dumps({"type": "clear"})
 
-            # Preserve time portion if present (e.g. "T10:00:00").
-            time_part = ""
-            if "T" in value:
-                _, time_part = value.split("T", 1)
-                time_part = f"T{time_part}"
-
-            mapped_date = DEMO_WEEK_DATES[(idx + offset) % len(DEMO_WEEK_DATES)]
-            timing[key] = f"{mapped_date}{time_part}"
-
-    return orders
-
-
-def verify_member_id(member_id):
-    member_id = resolve_member_id(member_id)
-    orders = load_pharmacy_data()
-    member_exists = any(normalize_id(o["member_id"]) == member_id for o in orders)
-    if member_exists:
-        return {"found": True, "member_id": member_id}
-    return {"found": False, "member_id": member_id}
-
-
-def list_member_orders(member_id):
-    member_id = resolve_member_id(member_id)
-    orders = load_pharmacy_data()
-    member_orders = [
-        {"order_id": o["order_id"], "status": o["status"]}
-        for o in orders
-        if normalize_id(o["member_id"]) == member_id
-    ]
-    if member_orders:
-        return {
-            "found": True,
-            "member_id": member_id,
-            "order_count": len(member_orders),
-            "orders": member_orders,
-        }
-    return {"found": False, "member_id": member_id}
 
+async def _wait_child(task: asyncio.Task):
+    """Wait for ``task`` without raising if it was cancelled by a barge-in.
 
-def _resolve_member_order(order_id: str, member_id: str):
-    """
-    Resolve an order for a member. If the provided order_id is wrong but the member
-    has exactly one order, use that order as a conversational fallback.
+    If the waiting worker itself is cancelled, the child is cancelled too.
     """
-    orders = load_pharmacy_data()
-    member_orders = [o for o in orders if normalize_id(o["member_id"]) == member_id]
-    matched = next((o for o in member_orders if normalize_id(o["order_id"]) == order_id), None)
-    if matched:
-        return matched, False
-    if len(member_orders) == 1:
-        return member_orders[0], True
-    return None, False
-
-
-def get_order_details(**kwargs):
-    order_id = normalize_id(kwargs["order_id"])
-    member_id = resolve_member_id(kwargs["member_id"])
-    order, inferred = _resolve_member_order(order_id, member_id)
-    if order:
-        return {
-            "found": True,
-            "verified": True,
-            "order_id": order["order_id"],
-            "status": order["status"],
-            "prescriptions": order["prescriptions"],
-            "resolved_order_from_member_context": inferred,
-        }
-    orders = load_pharmacy_data()
-    if next((o for o in orders if normalize_id(o["order_id"]) == order_id), None):
-        return {"found": True, "verified": False}
-    return {"found": False, "verified": False}
-
-
-def get_order_timing(**kwargs):
-    order_id = normalize_id(kwargs["order_id"])
-    member_id = resolve_member_id(kwargs["member_id"])
-    order, inferred = _resolve_member_order(order_id, member_id)
-    if order:
-        return {
-            "found": True,
-            "verified": True,
-            "order_id": order["order_id"],
-            "status": order["status"],
-            "timing": order["timing"],
-            "resolved_order_from_member_context": inferred,
-        }
-    orders = load_pharmacy_data()
-    if next((o for o in orders if normalize_id(o["order_id"]) == order_id), None):
-        return {"found": True, "verified": False}
-    return {"found": False, "verified": False}
-
-
-def get_order_refills(**kwargs):
-    order_id = normalize_id(kwargs["order_id"])
-    member_id = resolve_member_id(kwargs["member_id"])
-    order, inferred = _resolve_member_order(order_id, member_id)
-    if order:
-        refills = [
-            {
-                "medication": rx["name"],
-                "rx_id": rx["rx_id"],
-                "refills_remaining": rx["refills_remaining"],
-            }
-            for rx in order["prescriptions"]
-        ]
-        return {
-            "found": True,
-            "verified": True,
-            "order_id": order["order_id"],
-            "refills": refills,
-            "resolved_order_from_member_context": inferred,
-        }
-    orders = load_pharmacy_data()
-    if next((o for o in orders if normalize_id(o["order_id"]) == order_id), None):
-        return {"found": True, "verified": False}
-    return {"found": False, "verified": False}
-
-
-def lookup_order_status(**kwargs):
-    order_id = normalize_id(kwargs["order_id"])
-    member_id = resolve_member_id(kwargs["member_id"])
-    orders = load_pharmacy_data()
-    order = next((o for o in orders if normalize_id(o["order_id"]) == order_id), None)
-    if order:
-        if normalize_id(order["member_id"]) == member_id:
-            return {
-                "found": True,
-                "verified": True,
-                "order_id": order["order_id"],
-                "member_id": order["member_id"],
-                "status": order["status"],
-                "prescriptions": order["prescriptions"],
-                "timing": order["timing"],
-                "pharmacy": order["pharmacy"],
-            }
-        return {
-            "found": True,
-            "verified": False,
-            "order_id": order_id,
-            "member_id": member_id,
-        }
-    return {"found": False, "verified": False, "order_id": order_id}
-
-
-def end_session(**kwargs):
-    """End session cleanly like Pipecat implementation"""
-    return {"status": "ending", "message": "Session ended"}
-
-
-FUNCTION_MAP = {
-    "verify_member_id": lambda args: verify_member_id(**args),
-    "list_member_orders": lambda args: list_member_orders(**args),
-    "get_order_details": lambda args: get_order_details(**args),
-    "get_order_timing": lambda args: get_order_timing(**args),
-    "get_order_refills": lambda args: get_order_refills(**args),
-    "lookup_order_status": lambda args: lookup_order_status(**args),
-    "end_session": lambda args: end_session(**args),
-}
+    try:
+        await asyncio.wait((task,))
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
 
 
 # ---------------------------------------------------------------------------
@@ -444,9 +380,23 @@ class VoiceAgent:
         self.session_id = session_id
         self.websocket = websocket
         self.stt_connection = None
-        self.conversation_history: list[dict] = []
-        self.is_processing = False
-        self._processing_lock = asyncio.Lock()
+        # Bound once the STT connection is up; called for every audio frame.
+        self._send_media = None
+        self._last_audio_error = 0.0
+        self._tts_ws: Optional[websockets.WebSocketClientProtocol] = None
+        self._tts_lock = asyncio.Lock()
+        self.conversation_history: list[dict] = list(_INITIAL_HISTORY)
+        self._system_msg: dict = _SYSTEM_MSG
+        # STT → LLM → TTS run as separate stages joined by bounded queues, so
+        # LLM generation overlaps with synthesis/playback of earlier sentences.
+        self.llm_q: asyncio.Queue[str] = asyncio.Queue(maxsize=4)
+        self.tts_q: asyncio.Queue[str] = asyncio.Queue(maxsize=8)
+        self._workers: list[asyncio.Task] = []
+        # In-flight LLM turn and TTS batch, cancelled when the user barges in.
+        self._current_turn: Optional[asyncio.Task] = None
+        self._current_tts: Optional[asyncio.Task] = None
+        # Estimated monotonic time the client finishes playing queued audio.
+        self._playback_until = 0.0
         self.current_member_id = None
         self.current_order_id = None
         self._pending_transcript: str = ""
@@ -455,8 +405,7 @@ class VoiceAgent:
         self._flux_turn_timer: Optional[asyncio.Task] = None
 
     def _log(self, msg: str):
-        ts = time.strftime("%H:%M:%S", time.localtime())
-        print(f"[{ts}] [{self.session_id}] {msg}")
+        logger.info(f"[{self.session_id}] {msg}")
     
     async def _close_after_delay(self, delay: float):
         """Clean session ending like Pipecat implementation"""
@@ -516,17 +465,58 @@ class VoiceAgent:
     async def _process_user_transcript(self, transcript: str):
         if not transcript.strip():
             return
-        if self.is_processing:
-            return
-        async with self._processing_lock:
-            if self.is_processing:
-                return
-            self.is_processing = True
-            try:
-                await self.send_transcript(transcript, "user")
-                await self.process_with_llm(transcript)
-            finally:
-                self.is_processing = False
+        if self._is_responding():
+            await self._interrupt()
+        await self.llm_q.put(transcript)
+
+    def _is_responding(self) -> bool:
+        """True while a reply is being generated, synthesized or played."""
+        return (
+            (self._current_turn is not None and not self._current_turn.done())
+            or (self._current_tts is not None and not self._current_tts.done())
+            or not self.tts_q.empty()
+            or time.monotonic() < self._playback_until
+        )
+
+    async def _interrupt(self):
+        """Barge-in: drop the reply in progress so the new transcript goes next.
+
+        Cancels the LLM turn and the TTS batch, discards queued sentences and
+        tells the client to stop the audio it has already scheduled.
+        """
+        self._log("User interrupted; cancelling current response")
+        tasks = [
+            task for task in (self._current_turn, self._current_tts)
+            if task is not None and not task.done()
+        ]
+        for task in tasks:
+            task.cancel()
+        while not self.tts_q.empty():
+            self.tts_q.get_nowait()
+        if tasks:
+            await asyncio.wait(tasks)
+        self._playback_until = 0.0
+        await self.websocket.send_text(_CLEAR_FRAME)
+
+    async def _llm_worker(self):
+        """Consume final user transcripts one turn at a time."""
+        while True:
+            transcript = await self.llm_q.get()
+            await self.send_transcript(transcript, "user")
+            self._current_turn = asyncio.create_task(self.process_with_llm(transcript))
+            await _wait_child(self._current_turn)
+
+    async def _tts_worker(self):
+        """Synthesize queued sentences, batching any that arrive together."""
+        while True:
+            sentences = [await self.tts_q.get()]
+            while not self.tts_q.empty():
+                sentences.append(self.tts_q.get_nowait())
+            self._current_tts = asyncio.create_task(self.generate_tts_pipelined(sentences))
+            await _wait_child(self._current_tts)
+            if self._current_tts.cancelled():
+                # Deepgram is still streaming the abandoned audio; start clean.
+                await self._close_tts_ws()
 
     async def _flux_flush_turn(self, delay: float):
         """Debounce timer for Flux: process turn if no new partial arrives."""
@@ -553,7 +543,15 @@ class VoiceAgent:
             return
 
     async def start_stt(self):
-        """Initialize a per-session Deepgram STT connection."""
+        """Initialize per-session Deepgram STT and TTS connections."""
+        self._workers = [
+            asyncio.create_task(self._llm_worker()),
+            asyncio.create_task(self._tts_worker()),
+        ]
+        try:
+            self._tts_ws = await connect_tts_ws()
+        except Exception as e:
+            self._log(f"TTS connect failed, retrying on first utterance: {e}")
         try:
             if USE_SAGEMAKER_STT:
                 query = "&".join(f"{k}={v}" for k, v in STT_CONFIG.items())
@@ -571,6 +569,7 @@ class VoiceAgent:
                 self._stt_ctx = self._stt_client.listen.v1.connect(**STT_CONFIG)
                 self.stt_connection = await self._stt_ctx.__aenter__()
 
+            self._send_media = self.stt_connection.send_media
             self.stt_connection.on(EventType.OPEN, self._on_stt_open)
             self.stt_connection.on(EventType.MESSAGE, self._on_stt_message)
             self.stt_connection.on(EventType.ERROR, self._on_stt_error)
@@ -581,15 +580,13 @@ class VoiceAgent:
             self._log(f"STT connected via {mode}")
             await self.send_status("connected", f"STT connected via {mode}")
         except Exception as e:
-            await self.send_error(f"STT connection failed: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            await self.send_error(f"STT connection failed: {str(e)}", exc_info=True)
 
     async def _on_stt_open(self, _):
         self._log("STT connection opened")
 
     async def _on_stt_message(self, message):
-        """Handle STT transcript and trigger LLM (serialised via lock)."""
+        """Handle an STT message; final transcripts go onto ``llm_q`` for the LLM stage."""
         try:
             if USE_FLUX_STT:
                 # Flux v2: accumulate turn transcript, process only on EndOfTurn
@@ -635,7 +632,7 @@ class VoiceAgent:
                 if self._is_noise_transcript(transcript):
                     self._log(f"Ignoring noise transcript: '{transcript}'")
                     return
-                self._log(f"STT transcript: '{transcript}' (is_processing={self.is_processing})")
+                self._log(f"STT transcript: '{transcript}'")
 
                 if self._pending_transcript:
                     combined = f"{self._pending_transcript} {transcript}".strip()
@@ -658,7 +655,6 @@ class VoiceAgent:
                 await self._process_user_transcript(transcript)
         except Exception as e:
             await self.send_error(f"STT message error: {str(e)}")
-            self.is_processing = False
 
     async def _on_stt_error(self, error):
         self._log(f"STT error: {str(error)}")
@@ -666,15 +662,16 @@ class VoiceAgent:
 
     async def process_audio_chunk(self, audio_data):
         """Send audio chunk to STT."""
-        if self.stt_connection:
-            try:
-                await self.stt_connection.send_media(audio_data)
-            except Exception as e:
-                if not hasattr(self, "_last_audio_error") or (
-                    asyncio.get_event_loop().time() - self._last_audio_error > 1
-                ):
-                    self._log(f"Audio send error: {str(e)}")
-                    self._last_audio_error = asyncio.get_event_loop().time()
+        send_media = self._send_media
+        if send_media is None:
+            return
+        try:
+            await send_media(audio_data)
+        except Exception as e:
+            now = time.monotonic()
+            if now - self._last_audio_error > 1:
+                self._log(f"Audio send error: {str(e)}")
+                self._last_audio_error = now
 
     def _build_system_prompt(self) -> str:
         """Build system prompt with dynamic session context injected."""
@@ -685,23 +682,30 @@ class VoiceAgent:
             return PHARMACY_SYSTEM_PROMPT + ctx
         return PHARMACY_SYSTEM_PROMPT
 
-    def _get_safe_recent_history(self, max_messages: int) -> list:
-        """Get recent history without orphaning tool results from their tool_calls."""
+    def _system_message(self) -> dict:
+        """System message for the current session context, reused while unchanged."""
+        prompt = self._build_system_prompt()
+        if self._system_msg["content"] != prompt:
+            self._system_msg = {"role": "system", "content": prompt}
+        return self._system_msg
+
+    def _trim_history(self):
+        """Keep history append-only until it grows too long, then cut it back.
+
+        Between cuts every request starts with the same message prefix, so
+        OpenAI's prompt cache can serve it. The cut lands on a user message
+        so tool results are never orphaned from their tool_calls. The cut is
+        an in-place ``del``, so no new list is allocated per turn; a bounded
+        deque would instead evict one message at a time and shift the prefix
+        on every turn.
+        """
         history = self.conversation_history
-        if len(history) <= max_messages:
-            return list(history)
-        
-        # Start from the end and find a safe cut point
-        start = len(history) - max_messages
-        
-        # Walk back until we find a 'user' message — safest cut point
-        while start > 0:
-            role = history[start].get("role", "")
-            if role == "user":
-                break
+        if len(history) <= HISTORY_MAX_MESSAGES:
+            return
+        start = len(history) - HISTORY_KEEP_MESSAGES
+        while start > 0 and history[start].get("role") != "user":
             start -= 1
-        
-        return list(history[start:])
+        del history[:start]
 
     async def process_with_llm(self, user_text):
         """Process user text with OpenAI LLM with function calling."""
@@ -710,245 +714,43 @@ class VoiceAgent:
             # await self.send_status("thinking", "Processing your request...")
 
             self.conversation_history.append({"role": "user", "content": user_text})
-
-            # Smart conversation trimming: keep recent context but never orphan tool results
-            if len(self.conversation_history) > 10:
-                self.conversation_history = self.conversation_history[-8:]
-
-            system_prompt = self._build_system_prompt()
-            # Build safe message window that never splits tool_calls from tool results
-            recent = self._get_safe_recent_history(6)
-            messages = [
-                {"role": "system", "content": system_prompt}
-            ] + recent
-
-            response = await openai_client.chat.completions.create(
-                model=LLM_CONFIG["model"],
-                messages=messages,
-                tools=TOOLS,
-                tool_choice="auto",
-                temperature=LLM_CONFIG["temperature"],
-                max_tokens=LLM_CONFIG["max_tokens"],
-                stream=False,  # Explicit non-streaming for faster response
-                top_p=0.8,     # Focus on high-probability tokens for speed
-            )
-
-            assistant_message = response.choices[0].message
-
-            if assistant_message.tool_calls:
-                # COMMENTED OUT: Send single acknowledgment before all function calls
-                # acknowledgments = [
-                #     "Please hold on a moment while I check that.",
-                #     "Let me look that up for you.", 
-                #     "Give me just a moment to check that.",
-                #     "One moment while I find that information.",
-                #     "Let me check that in the system.",
-                # ]
-                # ack_msg = random.choice(acknowledgments)
-                # await self.send_transcript(ack_msg, "assistant")
-                # await self.generate_tts(ack_msg)
-
-                tool_results = []
-                for tool_call in assistant_message.tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    self._log(f"Calling function: {function_name} with args: {function_args}")
-
-                    if function_name in FUNCTION_MAP:
-                        result = FUNCTION_MAP[function_name](function_args)
-                        self._log(f"Function result: {result}")
-
-                        if function_name == "verify_member_id" and result.get("found"):
-                            if self.current_member_id and self.current_member_id != result["member_id"]:
-                                self.current_order_id = None
-                            self.current_member_id = result["member_id"]
-                        elif function_name == "list_member_orders" and result.get("found"):
-                            orders = result.get("orders", [])
-                            if len(orders) == 1:
-                                self.current_order_id = orders[0]["order_id"]
-                        if "order_id" in function_args:
-                            self.current_order_id = function_args["order_id"]
-                    else:
-                        result = {"error": f"Unknown function: {function_name}"}
-
-                    tool_results.append({
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "content": json.dumps(result),
-                    })
-
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": assistant_message.content,
-                    "tool_calls": [
-                        {
-                            "id": tc.id,
-                            "type": "function",
-                            "function": {
-                                "name": tc.function.name,
-                                "arguments": tc.function.arguments,
-                            },
-                        }
-                        for tc in assistant_message.tool_calls
-                    ],
-                })
-
-                for tr in tool_results:
-                    self.conversation_history.append(tr)
-
-                system_prompt = self._build_system_prompt()
-                # Use full history here — tool results must follow their tool_calls
-                messages = [
-                    {"role": "system", "content": system_prompt}
-                ] + self.conversation_history
-
-                # Stream the post-function LLM response for faster first sentence
-                streamed_text = ""
-                streamed_tool_calls = []
-                stream = await openai_client.chat.completions.create(
-                    model=LLM_CONFIG["model"],
-                    messages=messages,
-                    tools=TOOLS,
-                    tool_choice="auto",
-                    temperature=LLM_CONFIG["temperature"],
-                    max_tokens=LLM_CONFIG["max_tokens"],
-                    stream=True,
-                    top_p=0.8,
-                )
-                
-                tts_ws = await get_tts_ws()
-                first_sentence_sent = False
-                self._streamed_tts = False
-                sentence_buffer = ""
-                llm_start = time.time()
-                
-                async for chunk in stream:
-                    delta = chunk.choices[0].delta if chunk.choices else None
-                    if not delta:
-                        continue
-                    
-                    # Accumulate tool calls if any
-                    if delta.tool_calls:
-                        for tc in delta.tool_calls:
-                            while len(streamed_tool_calls) <= tc.index:
-                                streamed_tool_calls.append({"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
-                            if tc.id:
-                                streamed_tool_calls[tc.index]["id"] = tc.id
-                            if tc.function:
-                                if tc.function.name:
-                                    streamed_tool_calls[tc.index]["function"]["name"] = tc.function.name
-                                if tc.function.arguments:
-                                    streamed_tool_calls[tc.index]["function"]["arguments"] += tc.function.arguments
-                    
-                    # Accumulate text content
-                    if delta.content:
-                        streamed_text += delta.content
-                        sentence_buffer += delta.content
-                        
-                        # Check for sentence boundary — send to TTS immediately
-                        import re
-                        if re.search(r'[.!?]\s*$', sentence_buffer) and not first_sentence_sent:
-                            first_sentence_ms = (time.time() - llm_start) * 1000
-                            self._log(f"LLM first sentence in {first_sentence_ms:.0f}ms: '{sentence_buffer.strip()[:50]}...'")
-                            await tts_ws.send(json.dumps({"type": "Speak", "text": sentence_buffer.strip()}))
-                            sentence_buffer = ""
-                            first_sentence_sent = True
-                            self._streamed_tts = True
-                
-                # Send any remaining text to TTS
-                if sentence_buffer.strip():
-                    await tts_ws.send(json.dumps({"type": "Speak", "text": sentence_buffer.strip()}))
-                    self._streamed_tts = True
-                
-                # Build a message-like object for compatibility
-                class _StreamedMessage:
-                    def __init__(self, content, tool_calls):
-                        self.content = content
-                        self.tool_calls = tool_calls
-                
-                # Convert accumulated tool calls into proper objects if any
-                final_tool_calls = None
-                if streamed_tool_calls and streamed_tool_calls[0]["id"]:
-                    class _TC:
-                        def __init__(self, d):
-                            self.id = d["id"]
-                            self.function = type('F', (), {"name": d["function"]["name"], "arguments": d["function"]["arguments"]})()
-                    final_tool_calls = [_TC(tc) for tc in streamed_tool_calls]
-                
-                final_message = _StreamedMessage(streamed_text or None, final_tool_calls)
-
-                while final_message.tool_calls:
+            self._trim_history()
+
+            # Built once per turn; tool-call rounds append to it in place.
+            messages = [self._system_message(), *self.conversation_history]
+
+            # Every round is streamed, so its sentences reach TTS as they
+            # complete rather than after the whole response.
+            message = await self._stream_llm(messages)
+
+            # COMMENTED OUT: Send single acknowledgment before all function calls
+            # acknowledgments = [
+            #     "Please hold on a moment while I check that.",
+            #     "Let me look that up for you.", 
+            #     "Give me just a moment to check that.",
+            #     "One moment while I find that information.",
+            #     "Let me check that in the system.",
+            # ]
+            # ack_msg = random.choice(acknowledgments)
+            # await self.send_transcript(ack_msg, "assistant")
+            # await self.generate_tts(ack_msg)
+
+            tool_rounds = 0
+            while message.tool_calls:
+                if tool_rounds:
                     self._log("Chained function call detected")
-                    chained_results = []
-                    for tool_call in final_message.tool_calls:
-                        function_name = tool_call.function.name
-                        function_args = json.loads(tool_call.function.arguments)
-                        self._log(f"Calling chained function: {function_name} with args: {function_args}")
-
-                        if function_name in FUNCTION_MAP:
-                            result = FUNCTION_MAP[function_name](function_args)
-                            self._log(f"Chained function result: {result}")
-
-                            if function_name == "verify_member_id" and result.get("found"):
-                                if self.current_member_id and self.current_member_id != result["member_id"]:
-                                    self.current_order_id = None
-                                self.current_member_id = result["member_id"]
-                            if function_name == "list_member_orders" and result.get("found"):
-                                orders = result.get("orders", [])
-                                if len(orders) == 1:
-                                    self.current_order_id = orders[0]["order_id"]
-                            if "order_id" in function_args:
-                                self.current_order_id = function_args["order_id"]
-                        else:
-                            result = {"error": f"Unknown function: {function_name}"}
-
-                        chained_results.append({
-                            "tool_call_id": tool_call.id,
-                            "role": "tool",
-                            "content": json.dumps(result),
-                        })
-
-                    self.conversation_history.append({
-                        "role": "assistant",
-                        "content": final_message.content,
-                        "tool_calls": [
-                            {
-                                "id": tc.id,
-                                "type": "function",
-                                "function": {
-                                    "name": tc.function.name,
-                                    "arguments": tc.function.arguments,
-                                },
-                            }
-                            for tc in final_message.tool_calls
-                        ],
-                    })
-
-                    for cr in chained_results:
-                        self.conversation_history.append(cr)
-
-                    system_prompt = self._build_system_prompt()
-                    # Use full history here — tool results must follow their tool_calls
-                    messages = [
-                        {"role": "system", "content": system_prompt}
-                    ] + self.conversation_history
-
-                    final_response = await openai_client.chat.completions.create(
-                        model=LLM_CONFIG["model"],
-                        messages=messages,
-                        tools=TOOLS,
-                        tool_choice="auto", 
-                        temperature=LLM_CONFIG["temperature"],
-                        max_tokens=LLM_CONFIG["max_tokens"],
-                        stream=False,
-                        top_p=0.8,
-                    )
-                    final_message = final_response.choices[0].message
+                tool_results = await self._execute_tool_calls(message)
+                new_messages = [_serialize_assistant_with_tools(message), *tool_results]
+                self.conversation_history.extend(new_messages)
+                # Tool results must follow their tool_calls; the session
+                # context in the system prompt may have changed.
+                messages.extend(new_messages)
+                messages[0] = self._system_message()
 
-                assistant_text = final_message.content
-            else:
-                assistant_text = assistant_message.content
-                self._streamed_tts = False  # No streaming for direct responses
+                message = await self._stream_llm(messages)
+                tool_rounds += 1
+
+            assistant_text = message.content
 
             self.conversation_history.append(
                 {"role": "assistant", "content": assistant_text}
@@ -957,114 +759,172 @@ class VoiceAgent:
             self._log(f"Assistant response: {assistant_text}")
             await self.send_transcript(assistant_text, "assistant")
 
-            # If sentences were already streamed to TTS during LLM streaming,
-            # just flush and collect audio. Otherwise use pipelined TTS.
-            if hasattr(self, '_streamed_tts') and self._streamed_tts:
-                self._log("TTS: flushing streamed sentences...")
-                tts_ws = await get_tts_ws()
-                await tts_ws.send(json.dumps({"type": "Flush"}))
-                
-                audio_chunks = []
-                tts_start = time.time()
-                first_chunk_time = None
-                while True:
-                    msg = await asyncio.wait_for(tts_ws.recv(), timeout=15.0)
-                    if isinstance(msg, bytes):
-                        if first_chunk_time is None:
-                            first_chunk_time = (time.time() - tts_start) * 1000
-                            self._log(f"TTS first audio chunk: {first_chunk_time:.1f}ms")
-                        audio_chunks.append(msg)
-                    else:
-                        data = json.loads(msg)
-                        if data.get("type") == "Flushed":
-                            break
-                
-                if audio_chunks:
-                    audio_data = b"".join(audio_chunks)
-                    self._log(f"TTS completed: {(time.time() - tts_start)*1000:.1f}ms, {len(audio_data)} bytes")
-                    audio_b64 = base64.b64encode(audio_data).decode("utf-8")
-                    await self.websocket.send_json({
-                        "type": "audio",
-                        "data": audio_b64,
-                        "sampleRate": TTS_CONFIG["sample_rate"],
-                        "encoding": TTS_CONFIG["encoding"],
-                    })
+        except asyncio.TimeoutError:
+            await self.send_error(f"LLM error: no response from the model within {LLM_TIMEOUT:.0f}s")
+        except Exception as e:
+            await self.send_error(f"LLM error: {str(e)}", exc_info=True)
+
+    async def _execute_tool_calls(self, msg) -> list[dict]:
+        """Run the tool calls on ``msg`` concurrently and return the tool messages.
+
+        Calls in one assistant message are independent, so the tool phase
+        takes as long as the slowest call. Session state is then updated from
+        the results in call order, as if they had run one after another.
+        """
+        calls = []
+        for tool_call in msg.tool_calls:
+            function_name = tool_call.function.name
+            function_args = {}
+            error = None
+            if function_name not in FUNCTION_MAP:
+                error = f"Unknown function: {function_name}"
             else:
-                self._log("Generating TTS (pipelined)...")
-                await self.generate_tts_pipelined(assistant_text)
-            self._log("TTS completed")
+                try:
+                    function_args = _parse_tool_args(function_name, tool_call.function.arguments)
+                except ValueError as e:
+                    error = str(e)
+            if error:
+                self._log(f"Skipping function call: {error}")
+            else:
+                self._log(f"Calling function: {function_name} with args: {function_args}")
+            calls.append((tool_call, function_name, function_args, error))
+
+        results = await asyncio.gather(*(
+            _tool_error(error) if error else call_tool(function_name, function_args)
+            for _, function_name, function_args, error in calls
+        ))
+
+        tool_results = []
+        for (tool_call, function_name, function_args, error), result in zip(calls, results):
+            if not error:
+                self._log(f"Function result: {result}")
+
+                if function_name == "verify_member_id" and result.get("found"):
+                    if self.current_member_id and self.current_member_id != result["member_id"]:
+                        self.current_order_id = None
+                    self.current_member_id = result["member_id"]
+                elif function_name == "list_member_orders" and result.get("found"):
+                    orders = result.get("orders", [])
+                    if len(orders) == 1:
+                        self.current_order_id = orders[0]["order_id"]
+                if "order_id" in function_args:
+                    self.current_order_id = function_args["order_id"]
+
+            tool_results.append({
+                "tool_call_id": tool_call.id,
+                "role": "tool",
+                "content": _json_dumps(result),
+            })
+        return tool_results
 
-        except Exception as e:
-            await self.send_error(f"LLM error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+    async def _stream_llm(self, messages: list[dict]) -> SimpleNamespace:
+        """Stream a completion, queueing each finished sentence for TTS.
 
-    @staticmethod
-    def _split_sentences(text: str) -> list[str]:
-        """Split text into sentences for pipelined TTS."""
-        import re
-        # Split on sentence-ending punctuation followed by space or end
-        parts = re.split(r'(?<=[.!?])\s+', text.strip())
-        return [p.strip() for p in parts if p.strip()]
-
-    async def generate_tts_pipelined(self, text):
+        Tool-call deltas are accumulated by index and only returned when the
+        stream finishes with ``finish_reason == "tool_calls"``.
+
+        Each wait for the next chunk is bounded by ``LLM_TIMEOUT``. A stall
+        before any text raises ``asyncio.TimeoutError``; a stall mid-reply
+        ends the stream and returns the text received so far, which has
+        already been queued for TTS.
+        """
+        stream = await asyncio.wait_for(
+            openai_client.chat.completions.create(
+                **_LLM_KWARGS,
+                messages=messages,
+                stream=True,
+            ),
+            LLM_TIMEOUT,
+        )
+
+        content = ""
+        sentence_buffer = ""
+        tool_calls: dict[int, dict] = {}
+        finish_reason = None
+        first_sentence_sent = False
+        llm_start = time.time()
+
+        chunks = aiter(stream)
+        while True:
+            try:
+                chunk = await asyncio.wait_for(anext(chunks), LLM_TIMEOUT)
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                if not content:
+                    await stream.close()
+                    raise
+                self._log(f"LLM stream stalled for {LLM_TIMEOUT:.0f}s; ending reply early")
+                await stream.close()
+                finish_reason = None
+                break
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            finish_reason = choice.finish_reason or finish_reason
+            delta = choice.delta
+            if not delta:
+                continue
+
+            if delta.tool_calls:
+                for tc in delta.tool_calls:
+                    acc = tool_calls.setdefault(tc.index, {"id": "", "name": "", "arguments": ""})
+                    if tc.id:
+                        acc["id"] = tc.id
+                    if tc.function:
+                        if tc.function.name:
+                            acc["name"] = tc.function.name
+                        if tc.function.arguments:
+                            acc["arguments"] += tc.function.arguments
+
+            if delta.content:
+                content += delta.content
+                sentence_buffer += delta.content
+                # Hand every completed sentence to the TTS stage right away
+                end = 0
+                for match in _SENTENCE_END_RE.finditer(sentence_buffer):
+                    end = match.end()
+                if end:
+                    sentence = sentence_buffer[:end].strip()
+                    sentence_buffer = sentence_buffer[end:]
+                    if not first_sentence_sent:
+                        first_sentence_ms = (time.time() - llm_start) * 1000
+                        self._log(f"LLM first sentence in {first_sentence_ms:.0f}ms: '{sentence[:50]}...'")
+                        first_sentence_sent = True
+                    await self.tts_q.put(sentence)
+
+        if sentence_buffer.strip():
+            await self.tts_q.put(sentence_buffer.strip())
+
+        final_tool_calls = None
+        if finish_reason == "tool_calls" and tool_calls:
+            final_tool_calls = [
+                SimpleNamespace(
+                    id=tc["id"],
+                    function=SimpleNamespace(name=tc["name"], arguments=tc["arguments"]),
+                )
+                for _, tc in sorted(tool_calls.items())
+            ]
+        return SimpleNamespace(content=content or None, tool_calls=final_tool_calls)
+
+    async def generate_tts_pipelined(self, sentences: list[str]):
         """Pipeline TTS: send each sentence to TTS WebSocket immediately.
         
         Deepgram's streaming TTS WebSocket queues Speak messages internally,
         so we send all sentences rapidly, then Flush once. Audio for the first
         sentence starts generating immediately while later sentences queue.
         """
-        if not text or not text.strip():
+        if not sentences:
             self._log("TTS skipped: empty text")
             return
         try:
             start_time = time.time()
-            sentences = self._split_sentences(text)
             self._log(f"TTS pipelined: {len(sentences)} sentence(s)")
-            
-            tts_ws = await get_tts_ws()
-            
-            # Send all sentences to the TTS WebSocket buffer immediately
-            for sentence in sentences:
-                await tts_ws.send(json.dumps({"type": "Speak", "text": sentence}))
-            
-            # Single Flush triggers generation of all queued text
-            await tts_ws.send(json.dumps({"type": "Flush"}))
-            
-            # Collect all audio chunks until Flushed
-            audio_chunks = []
-            first_chunk_time = None
-            while True:
-                msg = await asyncio.wait_for(tts_ws.recv(), timeout=15.0)
-                if isinstance(msg, bytes):
-                    if first_chunk_time is None:
-                        first_chunk_time = (time.time() - start_time) * 1000
-                        self._log(f"TTS first audio chunk: {first_chunk_time:.1f}ms")
-                    audio_chunks.append(msg)
-                else:
-                    data = json.loads(msg)
-                    if data.get("type") == "Flushed":
-                        break
-
-            if audio_chunks:
-                audio_data = b"".join(audio_chunks)
-                tts_time = (time.time() - start_time) * 1000
-                self._log(f"TTS completed: {tts_time:.1f}ms, {len(audio_data)} bytes")
-                
-                audio_b64 = base64.b64encode(audio_data).decode("utf-8")
-                await self.websocket.send_json({
-                    "type": "audio",
-                    "data": audio_b64,
-                    "sampleRate": TTS_CONFIG["sample_rate"],
-                    "encoding": TTS_CONFIG["encoding"],
-                })
+            await self._speak(sentences, start_time, timeout=15.0)
 
         except Exception as e:
-            global _tts_ws
-            _tts_ws = None
-            await self.send_error(f"TTS pipeline error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            await self._close_tts_ws()
+            await self.send_error(f"TTS pipeline error: {str(e)}", exc_info=True)
 
     async def generate_tts(self, text):
         """Generate speech using Deepgram streaming TTS WebSocket for lowest latency."""
@@ -1074,85 +934,107 @@ class VoiceAgent:
         try:
             start_time = time.time()
             self._log(f"TTS request for: '{text[:50]}...' (len={len(text)})")
-
-            tts_ws = await get_tts_ws()
-            
-            # Send text and flush to trigger immediate generation
-            await tts_ws.send(json.dumps({"type": "Speak", "text": text}))
-            await tts_ws.send(json.dumps({"type": "Flush"}))
-            
-            # Collect audio chunks until Flushed message
-            audio_chunks = []
-            first_chunk_time = None
-            while True:
-                msg = await asyncio.wait_for(tts_ws.recv(), timeout=10.0)
-                if isinstance(msg, bytes):
-                    if first_chunk_time is None:
-                        first_chunk_time = (time.time() - start_time) * 1000
-                        self._log(f"TTS first audio chunk: {first_chunk_time:.1f}ms")
-                    audio_chunks.append(msg)
-                else:
-                    data = json.loads(msg)
-                    if data.get("type") == "Flushed":
-                        break
-
-            if audio_chunks:
-                audio_data = b"".join(audio_chunks)
-                tts_time = (time.time() - start_time) * 1000
-                self._log(f"TTS completed: {tts_time:.1f}ms, {len(audio_data)} bytes")
-                
-                audio_b64 = base64.b64encode(audio_data).decode("utf-8")
-                await self.websocket.send_json({
-                    "type": "audio",
-                    "data": audio_b64,
-                    "sampleRate": TTS_CONFIG["sample_rate"],
-                    "encoding": TTS_CONFIG["encoding"],
-                })
+            await self._speak([text], start_time, timeout=10.0)
 
         except Exception as e:
             # Reset TTS connection on error
-            global _tts_ws
-            _tts_ws = None
-            await self.send_error(f"TTS error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            await self._close_tts_ws()
+            await self.send_error(f"TTS error: {str(e)}", exc_info=True)
+
+    async def _speak(self, texts: list[str], start_time: float, timeout: float):
+        """Play ``texts`` from the TTS cache, or synthesize and forward them.
+
+        Each chunk is sent as soon as Deepgram yields it, so playback starts
+        on the first chunk instead of after the whole utterance.
+        """
+        text = " ".join(texts)
+        cached = _tts_cache_get(text)
+        if cached is not None:
+            for chunk in cached:
+                await self._send_audio(chunk)
+            tts_time = (time.time() - start_time) * 1000
+            self._log(f"TTS cache hit: {tts_time:.1f}ms")
+            return
+
+        chunks: list[bytes] = []
+        async with self._tts_lock:
+            tts_ws = await self._get_tts_ws()
+            async for chunk in _synthesize_tts(tts_ws, texts, timeout):
+                if not chunks:
+                    first_chunk_time = (time.time() - start_time) * 1000
+                    self._log(f"TTS first audio chunk: {first_chunk_time:.1f}ms")
+                chunks.append(chunk)
+                await self._send_audio(chunk)
+
+        if chunks:
+            tts_time = (time.time() - start_time) * 1000
+            self._log(f"TTS completed: {tts_time:.1f}ms, {sum(map(len, chunks))} bytes")
+            _tts_cache_put(text, chunks)
+
+    async def _get_tts_ws(self) -> websockets.WebSocketClientProtocol:
+        """Return this session's TTS connection, reconnecting if it closed."""
+        if self._tts_ws is None or self._tts_ws.close_code is not None:
+            self._tts_ws = await connect_tts_ws()
+        return self._tts_ws
+
+    async def _close_tts_ws(self):
+        tts_ws, self._tts_ws = self._tts_ws, None
+        if tts_ws is not None:
+            try:
+                await tts_ws.close()
+            except Exception:
+                pass
+
+    async def _send_audio(self, chunk: bytes):
+        await self._send_audio_frame(_audio_frame(chunk))
+
+    async def _send_audio_frame(self, frame: bytes):
+        await self.websocket.send_bytes(frame)
+        seconds = (len(frame) - len(_AUDIO_PREFIX)) / _AUDIO_BYTES_PER_SECOND
+        self._playback_until = max(self._playback_until, time.monotonic()) + seconds
 
     async def send_transcript(self, text, speaker):
-        await self.websocket.send_json({
+        await _send_json(self.websocket, {
             "type": "transcript",
             "text": text,
             "speaker": speaker,
         })
 
     async def send_status(self, status, message):
-        await self.websocket.send_json({
+        await _send_json(self.websocket, {
             "type": "status",
             "status": status,
             "message": message,
         })
 
-    async def send_error(self, error):
-        await self.websocket.send_json({
+    async def send_error(self, error, exc_info: bool = False):
+        """Report ``error`` to the client; ``exc_info`` logs the active traceback."""
+        logger.opt(exception=exc_info).error(f"[{self.session_id}] {error}")
+        await _send_json(self.websocket, {
             "type": "error",
             "message": error,
         })
-        self._log(f"ERROR: {error}")
 
     async def send_initial_greeting(self):
         try:
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": GREETING,
-            })
             await self.send_transcript(GREETING, "assistant")
-            await self.generate_tts(GREETING)
+            if _GREETING_FRAMES:
+                for frame in _GREETING_FRAMES:
+                    await self._send_audio_frame(frame)
+            else:
+                await self.generate_tts(GREETING)
         except Exception as e:
             self._log(f"Error sending initial greeting: {e}")
 
     async def stop_stt(self):
-        """Close STT connection."""
+        """Close the STT and TTS connections and stop the LLM/TTS workers."""
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
         self._clear_pending_transcript_task()
         self._pending_transcript = ""
+        self._send_media = None
+        await self._close_tts_ws()
         if self.stt_connection:
             try:
                 if not USE_FLUX_STT:
@@ -1176,7 +1058,7 @@ async def root():
 
 @app.get("/api/pharmacy-data")
 async def pharmacy_data():
-    return load_pharmacy_data()
+    return await load_pharmacy_data()
 
 
 @app.get("/health")
@@ -1193,6 +1075,13 @@ async def issue_ws_token():
     return {"token": _create_ws_token()}
 
 
+# Client control messages handled by the receive loop.
+_PING = "ping"
+_STOP_RECORDING = "stop_recording"
+_RESET = "reset"
+_PONG_FRAME = _json_dumps({"type": "pong"})
+
+
 @app.websocket("/ws/voice")
 async def voice_websocket(websocket: WebSocket, token: str = Query("")):
     if not _verify_ws_token(token):
@@ -1203,58 +1092,70 @@ async def voice_websocket(websocket: WebSocket, token: str = Query("")):
 
     if len(active_sessions) >= MAX_CONCURRENT_SESSIONS:
         await websocket.accept()
-        await websocket.send_json({
+        await _send_json(websocket, {
             "type": "error",
             "message": "Server is at capacity. Please try again later.",
         })
         await websocket.close()
-        print(f"[{session_id}] Rejected – at capacity ({len(active_sessions)} active)")
+        logger.warning(f"[{session_id}] Rejected – at capacity ({len(active_sessions)} active)")
         return
 
     await websocket.accept()
     agent = VoiceAgent(websocket, session_id)
     active_sessions[session_id] = agent
-    print(f"[{session_id}] Connected (active sessions: {len(active_sessions)})")
+    logger.info(f"[{session_id}] Connected (active sessions: {len(active_sessions)})")
 
     try:
         await agent.start_stt()
         await agent.send_initial_greeting()
 
+        receive = websocket.receive
+        process_audio_chunk = agent.process_audio_chunk
         while True:
-            data = await websocket.receive()
-
-            if "bytes" in data:
-                await agent.process_audio_chunk(data["bytes"])
-            elif "text" in data:
-                message = json.loads(data["text"])
-                if message.get("type") == "ping":
-                    await websocket.send_json({"type": "pong"})
-                elif message.get("type") == "stop_recording":
-                    await agent.send_status("processing", "Processing...")
-                elif message.get("type") == "reset":
-                    agent.conversation_history = []
-                    agent.current_member_id = None
-                    agent.current_order_id = None
-                    await agent.send_status("ready", "Conversation reset")
+            data = await receive()
+
+            # Audio frames dominate; check for them first and move on.
+            audio = data.get("bytes")
+            if audio is not None:
+                await process_audio_chunk(audio)
+                continue
+            text = data.get("text")
+            if text is None:
+                continue
+
+            message_type = _json_loads(text).get("type")
+            if message_type == _PING:
+                await websocket.send_text(_PONG_FRAME)
+            elif message_type == _STOP_RECORDING:
+                await agent.send_status("processing", "Processing...")
+            elif message_type == _RESET:
+                agent.conversation_history.clear()
+                agent.current_member_id = None
+                agent.current_order_id = None
+                await agent.send_status("ready", "Conversation reset")
     except WebSocketDisconnect:
         agent._log("Client disconnected")
     except RuntimeError as e:
         if 'Cannot call "receive" once a disconnect message has been received.' in str(e):
             agent._log("WebSocket closed after disconnect message")
         else:
-            agent._log(f"WebSocket runtime error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[{session_id}] WebSocket runtime error: {e}")
     except Exception as e:
-        agent._log(f"WebSocket error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"[{session_id}] WebSocket error: {e}")
     finally:
         await agent.stop_stt()
         active_sessions.pop(session_id, None)
-        print(f"[{session_id}] Cleaned up (active sessions: {len(active_sessions)})")
+        logger.info(f"[{session_id}] Cleaned up (active sessions: {len(active_sessions)})")
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    # Workers > 1 need a shared WS_TOKEN_SECRET.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        "main_backup:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+    )
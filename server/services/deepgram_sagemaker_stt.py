@@ -7,7 +7,6 @@ deepgram-sagemaker transport. Same Deepgram model, different inference backend.
 """
 
 import asyncio
-import json
 from typing import AsyncGenerator, Dict, Optional
 
 from loguru import logger
@@ -23,6 +22,8 @@ from deepgram.clients.listen.v1.websocket.response import (
 from deepgram.clients.common.v1.enums import LiveTranscriptionEvents
 from deepgram_sagemaker import SageMakerTransportFactory
 
+from services.json_utils import dumps as json_dumps, loads as json_loads
+
 
 class DeepgramSageMakerSTTService(DeepgramSTTService):
     """Deepgram STT routed through an AWS SageMaker endpoint.
@@ -92,25 +93,25 @@ class DeepgramSageMakerSTTService(DeepgramSTTService):
                     if isinstance(raw_message, bytes):
                         continue
 
-                    data = json.loads(raw_message) if isinstance(raw_message, str) else raw_message
+                    data = json_loads(raw_message) if isinstance(raw_message, str) else raw_message
                     response_type = data.get("type", "")
 
                     if response_type == LiveTranscriptionEvents.Transcript:
                         result = LiveResultResponse.from_json(
-                            raw_message if isinstance(raw_message, str) else json.dumps(data)
+                            raw_message if isinstance(raw_message, str) else json_dumps(data)
                         )
                         await self._on_message(result=result)
 
                     elif response_type == LiveTranscriptionEvents.SpeechStarted:
                         result = SpeechStartedResponse.from_json(
-                            raw_message if isinstance(raw_message, str) else json.dumps(data)
+                            raw_message if isinstance(raw_message, str) else json_dumps(data)
                         )
                         if self.vad_enabled:
                             await self._on_speech_started(result)
 
                     elif response_type == LiveTranscriptionEvents.UtteranceEnd:
                         result = UtteranceEndResponse.from_json(
-                            raw_message if isinstance(raw_message, str) else json.dumps(data)
+                            raw_message if isinstance(raw_message, str) else json_dumps(data)
                         )
                         if self.vad_enabled:
                             await self._on_utterance_end(result)
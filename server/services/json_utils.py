@@ -0,0 +1,30 @@
+"""JSON helpers shared by both servers and the services package.
+
+Uses orjson when it is installed and falls back to the stdlib ``json``
+module otherwise. ``dumps`` always returns ``str`` so its output can go
+straight into a WebSocket text frame.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj) -> str:
+    if orjson:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def loads(data: str | bytes):
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def dumps_sorted(obj) -> bytes:
+    """Canonical encoding with sorted keys, for use in cache keys."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True).encode()
@@ -4,15 +4,34 @@ Extracted from the original monolithic main.py so it can be shared between the
 hand-rolled WebSocket server (main_backup.py) and the Pipecat pipeline version.
 """
 
-import json
+import asyncio
+import os
+import re
+import threading
 import time
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+from loguru import logger
+
+from services.json_utils import dumps_sorted, loads as json_loads
+
 DATA_FILE = Path(__file__).parent.parent.parent / "data" / "pharmacy-order-data.json"
 
 _pharmacy_data_cache: Optional[list] = None
-_pharmacy_data_cache_time: float = 0
+_pharmacy_data_cache_mtime: int = 0
+_pharmacy_data_lock = threading.Lock()
+
+# Lookup indexes keyed by normalized ID, rebuilt alongside the data cache.
+_orders_by_member: dict[str, list["Order"]] = {}
+_orders_by_id: dict[str, "Order"] = {}
+
+# Short-lived tool results keyed by (function name, canonical JSON args).
+TOOL_CACHE_TTL = 5.0
+_TOOL_CACHE_MAX = 1024
+_tool_cache: dict[tuple[str, bytes], tuple[float, dict]] = {}
 
 DEMO_WEEK_DATES = [
     "2025-03-23",
@@ -23,21 +42,45 @@ DEMO_WEEK_DATES = [
 ]
 
 
+@dataclass(slots=True, frozen=True)
+class Order:
+    """One pharmacy order record, as held in the lookup indexes.
+
+    ``norm_member_id`` / ``norm_order_id`` are computed once at load time so
+    queries only ever normalize the caller-supplied IDs.
+    """
+
+    order_id: str
+    member_id: str
+    status: Optional[str]
+    prescriptions: Optional[list]
+    timing: Optional[dict]
+    pharmacy: Optional[dict]
+    norm_member_id: str
+    norm_order_id: str
+
+
 # ---------------------------------------------------------------------------
 # ID normalisation helpers
 # ---------------------------------------------------------------------------
 
+_NUMBER_WORDS = {
+    "ZERO": "0", "ONE": "1", "TWO": "2", "THREE": "3", "FOUR": "4",
+    "FIVE": "5", "SIX": "6", "SEVEN": "7", "EIGHT": "8", "NINE": "9",
+}
+_NUMBER_WORDS_RE = re.compile("|".join(sorted(_NUMBER_WORDS, key=len, reverse=True)))
+_ID_SEPARATORS = str.maketrans("", "", " -_")
+
+
+def _number_word_to_digit(match: re.Match) -> str:
+    return _NUMBER_WORDS[match.group()]
+
+
+@lru_cache(maxsize=4096)
 def normalize_id(id_raw: str) -> str:
     """Normalize IDs to handle transcription variations."""
-    number_words = {
-        "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4",
-        "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
-    }
-    normalized = id_raw.upper()
-    for word, digit in number_words.items():
-        normalized = normalized.replace(word.upper(), digit)
-    normalized = normalized.replace(" ", "").replace("-", "").replace("_", "")
-    return normalized
+    normalized = _NUMBER_WORDS_RE.sub(_number_word_to_digit, id_raw.upper())
+    return normalized.translate(_ID_SEPARATORS)
 
 
 def _levenshtein_distance(a: str, b: str) -> int:
@@ -59,24 +102,23 @@ def _levenshtein_distance(a: str, b: str) -> int:
     return prev[-1]
 
 
-def resolve_member_id(member_id_raw: str) -> str:
+async def resolve_member_id(member_id_raw: str) -> str:
     """Resolve spoken/noisy member IDs to the closest known ID."""
     candidate = normalize_id(member_id_raw)
-    orders = load_pharmacy_data()
-    known_ids = sorted({normalize_id(o["member_id"]) for o in orders})
+    await load_pharmacy_data()
 
-    if candidate in known_ids:
+    if candidate in _orders_by_member:
         return candidate
 
     if candidate.isdigit():
         m_prefixed = f"M{candidate}"
-        if m_prefixed in known_ids:
+        if m_prefixed in _orders_by_member:
             return m_prefixed
 
     best_id = None
     best_dist = 999
     tied = False
-    for known in known_ids:
+    for known in sorted(_orders_by_member):
         dist = _levenshtein_distance(candidate, known)
         if dist < best_dist:
             best_dist = dist
@@ -95,21 +137,61 @@ def resolve_member_id(member_id_raw: str) -> str:
 # Data loading
 # ---------------------------------------------------------------------------
 
-def load_pharmacy_data() -> list:
-    """Load pharmacy order data with in-memory caching."""
-    global _pharmacy_data_cache, _pharmacy_data_cache_time
-    now = time.time()
-    if _pharmacy_data_cache is not None and (now - _pharmacy_data_cache_time) < 60:
-        return _pharmacy_data_cache
+async def load_pharmacy_data() -> list:
+    """Load pharmacy order data, re-parsing only when the file's mtime changes.
+
+    The cold/reload path runs in a worker thread so file I/O never blocks the
+    event loop that is servicing live audio.
+    """
     try:
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
-            _pharmacy_data_cache = _normalize_dates_to_demo_week(data)
-            _pharmacy_data_cache_time = now
+        mtime = os.stat(DATA_FILE).st_mtime_ns
+        if _pharmacy_data_cache is not None and mtime == _pharmacy_data_cache_mtime:
             return _pharmacy_data_cache
+        data = await asyncio.to_thread(_reload_pharmacy_data, mtime)
+        # Cleared here rather than in the worker thread: call_tool iterates
+        # the cache on the event loop.
+        _tool_cache.clear()
+        return data
     except Exception as e:
-        print(f"Error loading pharmacy data: {e}")
-        return []
+        logger.error(f"Error loading pharmacy data: {e}")
+        return _pharmacy_data_cache or []
+
+
+def _reload_pharmacy_data(mtime: int) -> list:
+    """Parse the data file and rebuild the lookup indexes (blocking)."""
+    global _pharmacy_data_cache, _pharmacy_data_cache_mtime, _orders_by_member, _orders_by_id
+    with _pharmacy_data_lock:
+        if _pharmacy_data_cache is not None and mtime == _pharmacy_data_cache_mtime:
+            return _pharmacy_data_cache
+        raw = DATA_FILE.read_bytes()
+        data = json_loads(raw)
+        data = _normalize_dates_to_demo_week(data)
+        _orders_by_member, _orders_by_id = _build_indexes(data)
+        _pharmacy_data_cache = data
+        _pharmacy_data_cache_mtime = mtime
+        return _pharmacy_data_cache
+
+
+def _build_indexes(orders: list) -> tuple[dict[str, list[Order]], dict[str, Order]]:
+    """Index orders by normalized member ID and normalized order ID."""
+    by_member: dict[str, list[Order]] = {}
+    by_id: dict[str, Order] = {}
+    for o in orders:
+        # Fields are picked explicitly so extra or missing keys in a record
+        # don't fail the whole reload.
+        order = Order(
+            order_id=o["order_id"],
+            member_id=o["member_id"],
+            status=o.get("status"),
+            prescriptions=o.get("prescriptions"),
+            timing=o.get("timing"),
+            pharmacy=o.get("pharmacy"),
+            norm_member_id=normalize_id(o["member_id"]),
+            norm_order_id=normalize_id(o["order_id"]),
+        )
+        by_member.setdefault(order.norm_member_id, []).append(order)
+        by_id.setdefault(order.norm_order_id, order)
+    return by_member, by_id
 
 
 def _looks_like_iso_date(value: str) -> bool:
@@ -147,22 +229,16 @@ def _normalize_dates_to_demo_week(orders: list) -> list:
 # Tool functions (called by the LLM via function-calling)
 # ---------------------------------------------------------------------------
 
-def verify_member_id(member_id: str) -> dict:
-    member_id = resolve_member_id(member_id)
-    orders = load_pharmacy_data()
-    member_exists = any(normalize_id(o["member_id"]) == member_id for o in orders)
-    if member_exists:
-        return {"found": True, "member_id": member_id}
-    return {"found": False, "member_id": member_id}
+async def verify_member_id(member_id: str) -> dict:
+    member_id = await resolve_member_id(member_id)
+    return {"found": member_id in _orders_by_member, "member_id": member_id}
 
 
-def list_member_orders(member_id: str) -> dict:
-    member_id = resolve_member_id(member_id)
-    orders = load_pharmacy_data()
+async def list_member_orders(member_id: str) -> dict:
+    member_id = await resolve_member_id(member_id)
     member_orders = [
-        {"order_id": o["order_id"], "status": o["status"]}
-        for o in orders
-        if normalize_id(o["member_id"]) == member_id
+        {"order_id": o.order_id, "status": o.status}
+        for o in _orders_by_member.get(member_id, [])
     ]
     if member_orders:
         return {
@@ -176,57 +252,54 @@ def list_member_orders(member_id: str) -> dict:
 
 def _resolve_member_order(order_id: str, member_id: str):
     """Resolve an order for a member with single-order fallback."""
-    orders = load_pharmacy_data()
-    member_orders = [o for o in orders if normalize_id(o["member_id"]) == member_id]
-    matched = next((o for o in member_orders if normalize_id(o["order_id"]) == order_id), None)
-    if matched:
+    member_orders = _orders_by_member.get(member_id, [])
+    matched = _orders_by_id.get(order_id)
+    if matched and matched.norm_member_id == member_id:
         return matched, False
     if len(member_orders) == 1:
         return member_orders[0], True
     return None, False
 
 
-def get_order_details(**kwargs) -> dict:
+async def get_order_details(**kwargs) -> dict:
     order_id = normalize_id(kwargs["order_id"])
-    member_id = resolve_member_id(kwargs["member_id"])
+    member_id = await resolve_member_id(kwargs["member_id"])
     order, inferred = _resolve_member_order(order_id, member_id)
     if order:
         return {
             "found": True,
             "verified": True,
-            "order_id": order["order_id"],
-            "status": order["status"],
-            "prescriptions": order["prescriptions"],
+            "order_id": order.order_id,
+            "status": order.status,
+            "prescriptions": order.prescriptions,
             "resolved_order_from_member_context": inferred,
         }
-    orders = load_pharmacy_data()
-    if next((o for o in orders if normalize_id(o["order_id"]) == order_id), None):
+    if order_id in _orders_by_id:
         return {"found": True, "verified": False}
     return {"found": False, "verified": False}
 
 
-def get_order_timing(**kwargs) -> dict:
+async def get_order_timing(**kwargs) -> dict:
     order_id = normalize_id(kwargs["order_id"])
-    member_id = resolve_member_id(kwargs["member_id"])
+    member_id = await resolve_member_id(kwargs["member_id"])
     order, inferred = _resolve_member_order(order_id, member_id)
     if order:
         return {
             "found": True,
             "verified": True,
-            "order_id": order["order_id"],
-            "status": order["status"],
-            "timing": order["timing"],
+            "order_id": order.order_id,
+            "status": order.status,
+            "timing": order.timing,
             "resolved_order_from_member_context": inferred,
         }
-    orders = load_pharmacy_data()
-    if next((o for o in orders if normalize_id(o["order_id"]) == order_id), None):
+    if order_id in _orders_by_id:
         return {"found": True, "verified": False}
     return {"found": False, "verified": False}
 
 
-def get_order_refills(**kwargs) -> dict:
+async def get_order_refills(**kwargs) -> dict:
     order_id = normalize_id(kwargs["order_id"])
-    member_id = resolve_member_id(kwargs["member_id"])
+    member_id = await resolve_member_id(kwargs["member_id"])
     order, inferred = _resolve_member_order(order_id, member_id)
     if order:
         refills = [
@@ -235,37 +308,35 @@ def get_order_refills(**kwargs) -> dict:
                 "rx_id": rx["rx_id"],
                 "refills_remaining": rx["refills_remaining"],
             }
-            for rx in order["prescriptions"]
+            for rx in order.prescriptions
         ]
         return {
             "found": True,
             "verified": True,
-            "order_id": order["order_id"],
+            "order_id": order.order_id,
             "refills": refills,
             "resolved_order_from_member_context": inferred,
         }
-    orders = load_pharmacy_data()
-    if next((o for o in orders if normalize_id(o["order_id"]) == order_id), None):
+    if order_id in _orders_by_id:
         return {"found": True, "verified": False}
     return {"found": False, "verified": False}
 
 
-def lookup_order_status(**kwargs) -> dict:
+async def lookup_order_status(**kwargs) -> dict:
     order_id = normalize_id(kwargs["order_id"])
-    member_id = resolve_member_id(kwargs["member_id"])
-    orders = load_pharmacy_data()
-    order = next((o for o in orders if normalize_id(o["order_id"]) == order_id), None)
+    member_id = await resolve_member_id(kwargs["member_id"])
+    order = _orders_by_id.get(order_id)
     if order:
-        if normalize_id(order["member_id"]) == member_id:
+        if order.norm_member_id == member_id:
             return {
                 "found": True,
                 "verified": True,
-                "order_id": order["order_id"],
-                "member_id": order["member_id"],
-                "status": order["status"],
-                "prescriptions": order["prescriptions"],
-                "timing": order["timing"],
-                "pharmacy": order["pharmacy"],
+                "order_id": order.order_id,
+                "member_id": order.member_id,
+                "status": order.status,
+                "prescriptions": order.prescriptions,
+                "timing": order.timing,
+                "pharmacy": order.pharmacy,
             }
         return {
             "found": True,
@@ -276,7 +347,7 @@ def lookup_order_status(**kwargs) -> dict:
     return {"found": False, "verified": False, "order_id": order_id}
 
 
-def end_session(**kwargs) -> dict:
+async def end_session(**kwargs) -> dict:
     return {"status": "ending", "message": "Session ended"}
 
 
@@ -289,3 +360,20 @@ FUNCTION_MAP = {
     "lookup_order_status": lambda args: lookup_order_status(**args),
     "end_session": lambda args: end_session(**args),
 }
+
+
+async def call_tool(name: str, args: dict) -> dict:
+    """Dispatch a tool call through FUNCTION_MAP, reusing recent identical results."""
+    key = (name, dumps_sorted(args))
+    now = time.monotonic()
+    cached = _tool_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+    result = await FUNCTION_MAP[name](args)
+    if len(_tool_cache) >= _TOOL_CACHE_MAX:
+        for k in [k for k, (expires, _) in _tool_cache.items() if expires <= now]:
+            del _tool_cache[k]
+        if len(_tool_cache) >= _TOOL_CACHE_MAX:
+            _tool_cache.clear()
+    _tool_cache[key] = (now + TOOL_CACHE_TTL, result)
+    return result
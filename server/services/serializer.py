@@ -1,17 +1,17 @@
 """Custom Pipecat frame serializer for the RxConnect browser client.
 
 The browser sends raw PCM int16 audio as binary WebSocket frames and JSON
-text for control messages (ping, reset).  The server replies with JSON text
-frames containing either base64-encoded audio or metadata (transcripts,
-status, errors).
+text for control messages (ping, reset).  The server replies with binary
+frames carrying TTS audio and JSON text frames carrying metadata
+(transcripts, status, errors).
 
 This serializer translates between those wire formats and Pipecat frames so
-``FastAPIWebsocketTransport`` can drive the pipeline while keeping the
-existing React frontend unchanged.
+``FastAPIWebsocketTransport`` can drive the pipeline with the same protocol
+the React frontend speaks to ``main_backup.py``.
 """
 
-import base64
 import json
+import struct
 from typing import Optional
 
 from loguru import logger
@@ -27,6 +27,8 @@ from pipecat.frames.frames import (
 )
 from pipecat.serializers.base_serializer import FrameSerializer
 
+from services.json_utils import dumps as _dumps, loads as _loads
+
 
 class RxConnectFrameSerializer(FrameSerializer):
     """Serialize/deserialize frames for the RxConnect browser WebSocket protocol.
@@ -36,7 +38,7 @@ class RxConnectFrameSerializer(FrameSerializer):
         text    – JSON control messages: ``{"type":"ping"}``, ``{"type":"reset"}``
 
     Wire format (server → client):
-        text    – ``{"type":"audio","data":"<b64>","sampleRate":…,"encoding":"linear16"}``
+        binary  – little-endian uint32 sample rate, then raw PCM int16 mono audio
         text    – ``{"type":"transcript","text":"…","speaker":"user"|"assistant"}``
         text    – ``{"type":"status","status":"…","message":"…"}``
         text    – ``{"type":"pong"}``
@@ -53,26 +55,20 @@ class RxConnectFrameSerializer(FrameSerializer):
         self._sample_rate = self._params.input_sample_rate
 
     # ------------------------------------------------------------------
-    # Outgoing: Pipecat frames → browser JSON
+    # Outgoing: Pipecat frames → browser binary audio / JSON
     # ------------------------------------------------------------------
 
     async def serialize(self, frame: Frame) -> str | bytes | None:
         if isinstance(frame, AudioRawFrame):
-            audio_b64 = base64.b64encode(frame.audio).decode("utf-8")
-            return json.dumps({
-                "type": "audio",
-                "data": audio_b64,
-                "sampleRate": frame.sample_rate,
-                "encoding": "linear16",
-            })
+            return struct.pack("<I", frame.sample_rate) + frame.audio
 
         if isinstance(frame, InterruptionFrame):
-            return json.dumps({"type": "clear"})
+            return _dumps({"type": "clear"})
 
         if isinstance(frame, (OutputTransportMessageFrame, OutputTransportMessageUrgentFrame)):
             if self.should_ignore_frame(frame):
                 return None
-            return json.dumps(frame.message)
+            return _dumps(frame.message)
 
         return None
 
@@ -83,7 +79,7 @@ class RxConnectFrameSerializer(FrameSerializer):
     async def deserialize(self, data: str | bytes) -> Frame | None:
         if isinstance(data, str):
             try:
-                msg = json.loads(data)
+                msg = _loads(data)
                 msg_type = msg.get("type", "")
                 if msg_type == "ping":
                     return OutputTransportMessageFrame(message={"type": "pong"})